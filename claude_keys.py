@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """Claude Profile Manager — manage multiple LLM API key profiles."""
 
+import functools
+import json
 import sys
 import os
 
@@ -8,10 +10,12 @@ from config import (
     ACTIVE_ENV_PATH,
     CONSTANT_ENV_VARS,
     ENV_VAR_MAPPING,
+    ProfileStore,
     detect_shell_keys,
     detect_shell_rc,
     ensure_config_dir,
     extract_oauth_info,
+    find_profile,
     load_claude_credentials,
     load_claude_settings,
     load_profiles,
@@ -24,13 +28,11 @@ from config import (
     update_claude_json_oauth,
 )
 
-
-def find_profile(data, name):
-    """Find a profile by name. Returns the profile dict or None."""
-    for p in data.get("profiles", []):
-        if p["name"] == name:
-            return p
-    return None
+# Static parts of the active_env file, built once at import
+_CONSTANT_EXPORTS = "".join(f'export {env_var}="{value}"\n' for env_var, value in CONSTANT_ENV_VARS.items())
+# OAuth profiles unset all LLM provider vars (Claude Code manages OAuth internally)
+_OAUTH_ENV_CONTENT = "".join(f"unset {env_var}\n" for env_var in ENV_VAR_MAPPING) + _CONSTANT_EXPORTS
+_CLEAR_ENV_CONTENT = "".join(f"unset {env_var}\n" for env_var in [*ENV_VAR_MAPPING, *CONSTANT_ENV_VARS])
 
 
 def build_oauth_profile(name, description, oauth_info, model=None):
@@ -55,9 +57,28 @@ def build_oauth_profile(name, description, oauth_info, model=None):
     return profile
 
 
+def build_api_profile(name, description, api_key, base_url, model=None):
+    """Build an API key profile dict."""
+    profile = {
+        "name": name,
+        "description": description or name,
+        "type": "api",
+        "api_key": api_key,
+        "base_url": base_url,
+    }
+    if model:
+        profile["model"] = model
+    return profile
+
+
 def _set_settings_env(settings, base_url=None):
     """Update or clean up the env dict in settings for ANTHROPIC_BASE_URL."""
     env = settings.get("env", {})
+    if not base_url and "ANTHROPIC_BASE_URL" not in env:
+        # Nothing to remove (the usual OAuth/clear case); just drop an empty env
+        if not env:
+            settings.pop("env", None)
+        return
     if base_url:
         env["ANTHROPIC_BASE_URL"] = base_url
     else:
@@ -115,29 +136,25 @@ def update_claude_settings(profile=None):
 def write_env_file(profile):
     """Write the sourceable env file for the given profile."""
     ensure_config_dir()
-    lines = []
     profile_type = profile.get("type", "api")
 
-    for env_var, field in ENV_VAR_MAPPING.items():
-        # For OAuth profiles, unset all LLM provider vars (Claude Code manages OAuth internally)
-        if profile_type == "oauth":
-            lines.append(f'unset {env_var}')
-        # For API key profiles, skip ANTHROPIC_AUTH_TOKEN (only use ANTHROPIC_API_KEY)
-        elif profile_type == "api" and env_var == "ANTHROPIC_AUTH_TOKEN":
-            lines.append(f'unset {env_var}')
-        else:
-            value = profile.get(field, "")
-            # For profiles with no API key but a base_url (e.g. Ollama),
-            # use a dummy key so tools don't reject empty auth
-            if not value and field == "api_key" and profile.get("base_url"):
-                value = "ollama"
-            lines.append(f'export {env_var}="{value}"')
-
-    for env_var, value in CONSTANT_ENV_VARS.items():
-        lines.append(f'export {env_var}="{value}"')
+    if profile_type == "oauth":
+        content = _OAUTH_ENV_CONTENT
+    else:
+        values = {field: profile.get(field, "") for field in ("api_key", "base_url")}
+        # For profiles with no API key but a base_url (e.g. Ollama),
+        # use a dummy key so tools don't reject empty auth
+        if not values["api_key"] and profile.get("base_url"):
+            values["api_key"] = "ollama"
+        content = "".join(
+            # For API key profiles, skip ANTHROPIC_AUTH_TOKEN (only use ANTHROPIC_API_KEY)
+            f"unset {env_var}\n" if profile_type == "api" and env_var == "ANTHROPIC_AUTH_TOKEN"
+            else f'export {env_var}="{values[field]}"\n'
+            for env_var, field in ENV_VAR_MAPPING.items()
+        ) + _CONSTANT_EXPORTS
 
     with open(ACTIVE_ENV_PATH, "w") as f:
-        f.write("\n".join(lines) + "\n")
+        f.write(content)
 
     # Handle OAuth credentials
     if profile_type == "oauth":
@@ -159,67 +176,64 @@ def write_env_file(profile):
 def clear_env():
     """Write an env file that unsets all LLM-related variables."""
     ensure_config_dir()
-    lines = []
-    for env_var in ENV_VAR_MAPPING:
-        lines.append(f'unset {env_var}')
-    for env_var in CONSTANT_ENV_VARS:
-        lines.append(f'unset {env_var}')
     with open(ACTIVE_ENV_PATH, "w") as f:
-        f.write("\n".join(lines) + "\n")
+        f.write(_CLEAR_ENV_CONTENT)
     remove_claude_credentials()
     remove_claude_json_oauth()
     update_claude_settings(None)
-    data = load_profiles()
-    data["active"] = None
-    save_profiles(data)
+    with ProfileStore() as store:
+        store.set_active(None)
     print("Cleared all environment variables.")
     print(f"Environment written to {ACTIVE_ENV_PATH}")
 
 
-def save_current_oauth_credentials(data):
+def save_current_oauth_credentials(store):
     """If the currently active profile is OAuth, save fresh credentials back to it.
 
     Claude Code refreshes OAuth tokens periodically, so we need to capture
     the latest tokens before switching away to avoid restoring stale ones later.
+    The changes are flushed when the caller's ProfileStore exits.
     """
-    active = data.get("active")
+    active = store.active
     if not active:
         return
-    p = find_profile(data, active)
+    p = store.find(active)
     if p and p.get("type") == "oauth":
         credentials = load_claude_credentials()
         if credentials:
             p["credentials"] = credentials
-        oauth_info = extract_oauth_info()
+        # Pass {} rather than None when there are no credentials so they aren't re-read
+        oauth_info = extract_oauth_info(creds=credentials or {})
         if oauth_info and oauth_info.get("oauthAccount"):
             p["oauthAccount"] = oauth_info["oauthAccount"]
-        save_profiles(data)
+        store.mark_dirty()
 
 
 def switch_profile(name):
     """Switch to the named profile."""
-    data = load_profiles()
-    profile = find_profile(data, name)
-    if not profile:
-        print(f"Profile '{name}' not found.")
-        return False
-    # Save fresh OAuth credentials before switching away
-    save_current_oauth_credentials(data)
-    data["active"] = name
-    save_profiles(data)
+    with ProfileStore() as store:
+        profile = store.find(name)
+        if not profile:
+            print(f"Profile '{name}' not found.")
+            return False
+        # Save fresh OAuth credentials before switching away
+        save_current_oauth_credentials(store)
+        store.set_active(name)
     write_env_file(profile)
     print(f"Switched to: {name} ({profile['description']})")
     print(f"Environment written to {ACTIVE_ENV_PATH}")
     return True
 
 
-def print_profile_list(profiles, active):
-    """Print a formatted list of profiles."""
+def format_profile_list(profiles, active):
+    """Return a formatted list of profiles, one newline-terminated line each."""
+    lines = []
     for i, p in enumerate(profiles, 1):
         marker = "  [ACTIVE]" if p["name"] == active else ""
         profile_type = p.get("type", "api")
         type_badge = " [OAuth]" if profile_type == "oauth" else " [API]"
-        print(f"  {i}. {p['name']:<20s}{type_badge:<8s} - {p['description']}{marker}")
+        lines.append(f"  {i}. {p['name']:<20s}{type_badge:<8s} - {p['description']}{marker}\n")
+    return "".join(lines)
 
 
 def list_profiles():
@@ -230,9 +244,7 @@ def list_profiles():
     if not profiles:
         print("No profiles configured. Run 'claudeProfileManager add' to create one.")
         return
-    print()
-    print_profile_list(profiles, active)
-    print()
+    sys.stdout.write("\n" + format_profile_list(profiles, active) + "\n")
 
 
 def show_current():
@@ -248,29 +260,31 @@ def show_current():
         return
 
     profile_type = p.get("type", "api")
-    print(f"{active} ({p['description']})")
+    lines = [f"{active} ({p['description']})"]
 
     if profile_type == "oauth":
-        print(f"  Type: OAuth (Claude Pro Subscription)")
+        lines.append("  Type: OAuth (Claude Pro Subscription)")
         if p.get("emailAddress"):
-            print(f"  Account: {p['emailAddress']}")
+            lines.append(f"  Account: {p['emailAddress']}")
         if p.get("organizationName"):
-            print(f"  Organization: {p['organizationName']}")
+            lines.append(f"  Organization: {p['organizationName']}")
         if p.get("accountUuid"):
-            print(f"  Account UUID: {p['accountUuid']}")
-        print(f"  Auth: Native Claude Code OAuth (from ~/.claude.json)")
+            lines.append(f"  Account UUID: {p['accountUuid']}")
+        lines.append("  Auth: Native Claude Code OAuth (from ~/.claude.json)")
     elif p.get('api_key'):
-        print(f"  Type: API Key")
-        print(f"  API Key: {p['api_key'][:8]}...{p['api_key'][-4:]}" if len(p['api_key']) > 12 else f"  API Key: {p['api_key']}")
+        lines.append("  Type: API Key")
+        lines.append(f"  API Key: {p['api_key'][:8]}...{p['api_key'][-4:]}" if len(p['api_key']) > 12 else f"  API Key: {p['api_key']}")
         if p.get('base_url'):
-            print(f"  Base URL: {p['base_url']}")
+            lines.append(f"  Base URL: {p['base_url']}")
     else:
-        print(f"  Type: No Auth (e.g., Ollama)")
+        lines.append("  Type: No Auth (e.g., Ollama)")
         if p.get('base_url'):
-            print(f"  Base URL: {p['base_url']}")
+            lines.append(f"  Base URL: {p['base_url']}")
 
     if p.get("model"):
-        print(f"  Model: {p['model']}")
+        lines.append(f"  Model: {p['model']}")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def add_profile(exit_on_activate=False):
@@ -288,66 +302,56 @@ def add_profile(exit_on_activate=False):
         print("Cancelled.")
         return
     # Check for duplicate names
-    data = load_profiles()
-    if find_profile(data, name):
-        print(f"Profile '{name}' already exists.")
-        return
-
-    description = input("  Description: ").strip()
-    print()
-    print("  Profile Types:")
-    print("    1. OAuth - Use Claude Pro subscription (via claude code setup-token)")
-    print("    2. API Key - Use API key from Anthropic Console or proxy")
-    print()
-    profile_type = input("  Select type [1/2] (default: 2): ").strip() or "2"
-
-    if profile_type == "1":
-        # OAuth profile - extract from ~/.claude.json
-        oauth_info = extract_oauth_info()
-        if not oauth_info:
-            print()
-            print("  ERROR: No OAuth account found in ~/.claude.json")
-            print("  Run 'claude code setup-token' first to authenticate with Claude Pro.")
+    with ProfileStore() as store:
+        if store.find(name):
+            print(f"Profile '{name}' already exists.")
             return
 
+        description = input("  Description: ").strip()
         print()
-        print(f"  Found OAuth account: {oauth_info['emailAddress']}")
-        if oauth_info.get("organizationName"):
-            print(f"  Organization: {oauth_info['organizationName']}")
+        print("  Profile Types:")
+        print("    1. OAuth - Use Claude Pro subscription (via claude code setup-token)")
+        print("    2. API Key - Use API key from Anthropic Console or proxy")
         print()
+        profile_type = input("  Select type [1/2] (default: 2): ").strip() or "2"
 
-        model = input("  Claude Code model override (blank for default): ").strip()
-
-        profile = build_oauth_profile(name, description, oauth_info, model)
-    else:
-        # API key profile
-        api_key = input("  API Key (blank for none, e.g. Ollama): ").strip()
-        base_url = input("  Base URL (e.g. https://api.anthropic.com): ").strip()
-        model = input("  Claude Code model override (blank for default): ").strip()
-
-        profile = {
-            "name": name,
-            "description": description or name,
-            "type": "api",
-            "api_key": api_key,
-            "base_url": base_url,
-        }
-        if model:
-            profile["model"] = model
+        if profile_type == "1":
+            # OAuth profile - extract from ~/.claude.json
+            oauth_info = extract_oauth_info()
+            if not oauth_info:
+                print()
+                print("  ERROR: No OAuth account found in ~/.claude.json")
+                print("  Run 'claude code setup-token' first to authenticate with Claude Pro.")
+                return
 
-    data["profiles"].append(profile)
+            print()
+            print(f"  Found OAuth account: {oauth_info['emailAddress']}")
+            if oauth_info.get("organizationName"):
+                print(f"  Organization: {oauth_info['organizationName']}")
+            print()
 
-    # If this is the first profile, make it active
-    activated = False
-    if len(data["profiles"]) == 1:
-        data["active"] = name
-        write_env_file(profile)
-        print(f"\nProfile '{name}' added and activated (first profile).")
-        activated = True
-    else:
-        print(f"\nProfile '{name}' added.")
+            model = input("  Claude Code model override (blank for default): ").strip()
 
-    save_profiles(data)
+            profile = build_oauth_profile(name, description, oauth_info, model)
+        else:
+            # API key profile
+            api_key = input("  API Key (blank for none, e.g. Ollama): ").strip()
+            base_url = input("  Base URL (e.g. https://api.anthropic.com): ").strip()
+            model = input("  Claude Code model override (blank for default): ").strip()
+
+            profile = build_api_profile(name, description, api_key, base_url, model)
+
+        store.add(profile)
+
+        # If this is the first profile, make it active
+        activated = False
+        if len(store.profiles) == 1:
+            store.set_active(name)
+            write_env_file(profile)
+            print(f"\nProfile '{name}' added and activated (first profile).")
+            activated = True
+        else:
+            print(f"\nProfile '{name}' added.")
 
     if exit_on_activate and activated:
         return True
@@ -360,102 +364,99 @@ def remove_profile(name=None, exit_on_switch=False):
     Args:
         exit_on_switch: If True, returns True when active profile changes
     """
-    data = load_profiles()
-    profiles = data.get("profiles", [])
-    if not profiles:
-        print("No profiles to remove.")
-        return False
-
-    if not name:
-        list_profiles()
-        name = input("Enter profile name or # to remove: ").strip()
-        if not name:
-            print("Cancelled.")
+    with ProfileStore() as store:
+        profiles = store.profiles
+        if not profiles:
+            print("No profiles to remove.")
             return False
 
-    found = None
-    # Check if input is a number (index)
-    if name.isdigit():
-        idx = int(name) - 1
-        if 0 <= idx < len(profiles):
-            found = idx
-            name = profiles[idx]["name"]  # Get the actual profile name for messages
-    else:
-        # Look up by name
-        for i, p in enumerate(profiles):
-            if p["name"] == name:
-                found = i
-                break
-
-    if found is None:
-        print(f"Profile '{name}' not found.")
-        return False
+        if not name:
+            sys.stdout.write("\n" + format_profile_list(profiles, store.active) + "\n")
+            name = input("Enter profile name or # to remove: ").strip()
+            if not name:
+                print("Cancelled.")
+                return False
+
+        found = None
+        # Check if input is a number (index)
+        if name.isdigit():
+            idx = int(name) - 1
+            if 0 <= idx < len(profiles):
+                found = profiles[idx]
+                name = found["name"]  # Get the actual profile name for messages
+        else:
+            found = store.find(name)
 
-    try:
-        confirm = input(f"Remove profile '{name}'? [y/N]: ").strip().lower()
-        if confirm != "y":
-            print("Cancelled.")
+        if found is None:
+            print(f"Profile '{name}' not found.")
             return False
-    except EOFError:
-        # Non-interactive mode (e.g., piped input), proceed without confirmation
-        pass
-
-    profiles.pop(found)
-
-    # If we removed the active profile, clear active or set to first remaining
-    switched = False
-    if data.get("active") == name:
-        if profiles:
-            data["active"] = profiles[0]["name"]
-            write_env_file(profiles[0])
-            print(f"Active profile changed to: {profiles[0]['name']}")
-            switched = True
-        else:
-            data["active"] = None
-            # Clear the env file
-            if os.path.exists(ACTIVE_ENV_PATH):
-                os.remove(ACTIVE_ENV_PATH)
-            switched = True
 
-    data["profiles"] = profiles
-    save_profiles(data)
+        try:
+            confirm = input(f"Remove profile '{name}'? [y/N]: ").strip().lower()
+            if confirm != "y":
+                print("Cancelled.")
+                return False
+        except EOFError:
+            # Non-interactive mode (e.g., piped input), proceed without confirmation
+            pass
+
+        store.remove(name)
+
+        # If we removed the active profile, clear active or set to first remaining
+        switched = False
+        if store.active == name:
+            if profiles:
+                store.set_active(profiles[0]["name"])
+                write_env_file(profiles[0])
+                print(f"Active profile changed to: {profiles[0]['name']}")
+                switched = True
+            else:
+                store.set_active(None)
+                # Clear the env file
+                try:
+                    os.remove(ACTIVE_ENV_PATH)
+                except FileNotFoundError:
+                    pass
+                switched = True
+
     print(f"Profile '{name}' removed.")
 
     return exit_on_switch and switched
 
 
+_MENU_ACTIONS = (
+    "  a. Add new profile\n"
+    "  r. Remove a profile\n"
+    "  c. Clear all env variables\n"
+    "  q. Quit\n"
+    + "─" * 45 + "\n"
+)
+
+
 def interactive_menu():
     """Show interactive menu for profile management."""
     while True:
-        data = load_profiles()
-        active = data.get("active")
-        profiles = data.get("profiles", [])
-
-        # Find active profile description
-        active_profile = find_profile(data, active) if active else None
+        # Re-read each iteration: the actions below may have changed profiles
+        with ProfileStore() as store:
+            active = store.active
+            profiles = store.profiles
+            # Find active profile description
+            active_profile = store.find(active) if active else None
         active_desc = active_profile["description"] if active_profile else ""
 
-        print()
-        print("=" * 45)
-        print("  Claude Profile Manager")
-        print("=" * 45)
-
-        if active:
-            print(f"  Active: {active} ({active_desc})")
-        else:
-            print("  Active: (none)")
-        print()
-
-        if profiles:
-            print_profile_list(profiles, active)
-        else:
-            print("  (no profiles configured)")
-        print()
-        print("  a. Add new profile")
-        print("  r. Remove a profile")
-        print("  c. Clear all env variables")
-        print("  q. Quit")
-        print("─" * 45)
+        active_line = f"  Active: {active} ({active_desc})" if active else "  Active: (none)"
+        profile_lines = format_profile_list(profiles, active) if profiles else "  (no profiles configured)\n"
+        sys.stdout.write(
+            "\n"
+            + "=" * 45 + "\n"
+            + "  Claude Profile Manager\n"
+            + "=" * 45 + "\n"
+            + active_line + "\n"
+            + "\n"
+            + profile_lines
+            + "\n"
+            + _MENU_ACTIONS
+        )
 
         choice = input("Select profile # or action: ").strip().lower()
 
@@ -526,27 +527,31 @@ SHELL_FUNCTION_MARKER = "# claudeProfileManager shell function"
 SHELL_FUNCTION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shell_function.sh")
 
 
+@functools.lru_cache(maxsize=None)
+def _shell_function_block():
+    """Return the contents of shell_function.sh, read once per process."""
+    with open(SHELL_FUNCTION_FILE, "r") as f:
+        return f.read()
+
+
 def install_shell_function():
     """Add the claudeProfileManager shell function to the user's shell rc file."""
     rc_path = detect_shell_rc()
     rc_name = os.path.basename(rc_path)
 
-    if not os.path.exists(rc_path):
+    try:
+        with open(rc_path, "r") as f:
+            content = f.read()
+    except FileNotFoundError:
         print(f"~/{rc_name} not found — skipping shell function install.")
         return
 
-    with open(rc_path, "r") as f:
-        content = f.read()
-
     if SHELL_FUNCTION_MARKER in content:
         print(f"Shell function already in ~/{rc_name}")
         return
 
-    with open(SHELL_FUNCTION_FILE, "r") as f:
-        shell_function_block = f.read()
-
     with open(rc_path, "a") as f:
-        f.write(shell_function_block)
+        f.write(_shell_function_block())
 
     print(f"Added claudeProfileManager shell function to ~/{rc_name}")
     print(f"Run: source ~/{rc_name}  (or open a new terminal)")
@@ -576,23 +581,136 @@ def import_oauth_profile():
     name = input("  Profile name (default: claude-pro): ").strip() or "claude-pro"
 
     # Check for duplicate names
-    data = load_profiles()
-    if find_profile(data, name):
-        print(f"Profile '{name}' already exists.")
-        return
-
-    description = input("  Description (default: Claude Pro Subscription): ").strip() or "Claude Pro Subscription"
-    model = input("  Claude Code model override (blank for default): ").strip()
+    with ProfileStore() as store:
+        if store.find(name):
+            print(f"Profile '{name}' already exists.")
+            return
 
-    profile = build_oauth_profile(name, description, oauth_info, model)
+        description = input("  Description (default: Claude Pro Subscription): ").strip() or "Claude Pro Subscription"
+        model = input("  Claude Code model override (blank for default): ").strip()
 
-    data["profiles"].append(profile)
-    save_profiles(data)
+        store.add(build_oauth_profile(name, description, oauth_info, model))
 
     print(f"\nOAuth profile '{name}' added.")
     print(f"Use 'claudeProfileManager switch {name}' to activate.")
 
 
+def run_batch(ops):
+    """Apply a list of profile operations in a single ProfileStore session.
+
+    Each op is a dict with an "op" key:
+        {"op": "switch", "name": ...}
+        {"op": "add", "name": ..., "description": ..., "type": "api"|"oauth",
+         "api_key": ..., "base_url": ..., "model": ...}
+        {"op": "remove", "name": ...}
+        {"op": "clear"}
+
+    profiles.json is written once, and the env file and Claude settings are
+    written once for the final active profile. If any op fails, nothing is
+    saved. Returns True on success.
+    """
+    with ProfileStore() as store:
+        # Capture fresh tokens from the outgoing OAuth profile while they're on disk
+        save_current_oauth_credentials(store)
+        apply_env = False
+        # Only an explicit clear op resets Claude's files; removing the last
+        # profile just drops the env file, like remove_profile()
+        cleared = False
+        messages = []
+
+        for op in ops:
+            kind = op.get("op") if isinstance(op, dict) else None
+            name = op.get("name") if kind else None
+
+            if kind in ("switch", "add", "remove") and not (isinstance(name, str) and name):
+                error = f"Profile name must be a non-empty string: {op!r}"
+                break
+
+            if kind == "switch":
+                if not store.find(name):
+                    error = f"Profile '{name}' not found."
+                    break
+                store.set_active(name)
+                apply_env = True
+                cleared = False
+
+            elif kind == "add":
+                # Anything else would end up in profiles.json and break later commands
+                bad_fields = [
+                    field for field in ("description", "api_key", "base_url", "model")
+                    if op.get(field) is not None and not isinstance(op[field], str)
+                ]
+                if bad_fields:
+                    error = f"Fields must be strings: {', '.join(bad_fields)} in {op!r}"
+                    break
+                if op.get("type") not in (None, "api", "oauth"):
+                    error = f"Profile type must be 'api' or 'oauth': {op!r}"
+                    break
+                if store.find(name):
+                    error = f"Profile '{name}' already exists."
+                    break
+                if op.get("type") == "oauth":
+                    oauth_info = extract_oauth_info()
+                    if not oauth_info:
+                        error = "No OAuth account found in ~/.claude.json"
+                        break
+                    profile = build_oauth_profile(name, op.get("description"), oauth_info, op.get("model"))
+                else:
+                    profile = build_api_profile(
+                        name, op.get("description"), op.get("api_key") or "", op.get("base_url") or "", op.get("model")
+                    )
+                store.add(profile)
+                messages.append(f"Profile '{name}' added.")
+                # If this is the first profile, make it active
+                if len(store.profiles) == 1:
+                    store.set_active(name)
+                    apply_env = True
+                    cleared = False
+
+            elif kind == "remove":
+                if not store.remove(name):
+                    error = f"Profile '{name}' not found."
+                    break
+                messages.append(f"Profile '{name}' removed.")
+                # If we removed the active profile, fall back to the first remaining
+                if store.active == name:
+                    store.set_active(store.profiles[0]["name"] if store.profiles else None)
+                    apply_env = True
+
+            elif kind == "clear":
+                store.set_active(None)
+                apply_env = True
+                cleared = True
+
+            else:
+                error = f"Invalid batch operation: {op!r}"
+                break
+        else:
+            error = None
+
+        if error:
+            store.discard()
+            print(f"{error} Batch aborted; no changes saved.")
+            return False
+
+    for message in messages:
+        print(message)
+    if apply_env:
+        profile = store.find(store.active) if store.active else None
+        if profile:
+            write_env_file(profile)
+            print(f"Switched to: {profile['name']} ({profile['description']})")
+            print(f"Environment written to {ACTIVE_ENV_PATH}")
+        elif cleared:
+            clear_env()
+        else:
+            try:
+                os.remove(ACTIVE_ENV_PATH)
+            except FileNotFoundError:
+                pass
+    return True
+
+
 def main():
     args = sys.argv[1:]
 
@@ -635,6 +753,18 @@ def main():
     elif command == "import-oauth":
         import_oauth_profile()
 
+    elif command == "batch":
+        try:
+            ops = json.loads(sys.stdin.read())
+        except json.JSONDecodeError as e:
+            print(f"Invalid batch input: {e}")
+            sys.exit(1)
+        if not isinstance(ops, list):
+            print("Batch input must be a JSON list of operations.")
+            sys.exit(1)
+        if not run_batch(ops):
+            sys.exit(1)
+
     elif command == "help":
         print_usage()
 
@@ -657,6 +787,7 @@ def print_usage():
     print("  add             Add a new profile")
     print("  remove [name]   Remove a profile")
     print("  import-oauth    Import OAuth profile from ~/.claude.json")
+    print("  batch           Apply a JSON list of operations read from stdin")
     print("  clear           Unset all env variables")
     print("  help            Show this help")
     print()
@@ -1,8 +1,10 @@
 """Configuration management for Claude Profile Manager."""
 
+import copy
+import functools
 import json
 import os
-import re
+import stat
 
 CONFIG_DIR = os.path.expanduser("~/.config/claudeProfileManager")
 PROFILES_PATH = os.path.join(CONFIG_DIR, "profiles.json")
@@ -29,10 +31,105 @@ CONSTANT_ENV_VARS = {
     "OLLAMA_API_BASE": "http://127.0.0.1:11434",
 }
 
-DEFAULT_PROFILES = {
-    "active": None,
-    "profiles": []
-}
+# Shell vars detect_shell_keys() looks for in rc files
+_SHELL_KEY_VARS = frozenset({
+    "LITELLM_PROXY_API_KEY",
+    "LITELLM_PROXY_URL",
+    "ANTHROPIC_API_KEY",
+    "OPENAI_API_KEY",
+    "OPENAI_BASE_URL",
+})
+
+
+def _default_profiles():
+    """Return a fresh empty profiles structure (with its empty name index)."""
+    return {"active": None, "profiles": [], "_by_name": {}}
+
+
+def _dumps(obj):
+    """Serialize obj to indented JSON bytes with a trailing newline."""
+    return (json.dumps(obj, indent=2) + "\n").encode("utf-8")
+
+
+# path -> ((st_mtime_ns, st_size), hash of file bytes) as last read or written
+# by us, so saves can tell when the file already holds what they'd write
+_KNOWN_CONTENT = {}
+
+
+def _read_json(path, needle=None):
+    """Read and parse a JSON file, remembering its content for _atomic_write_json.
+
+    If needle (bytes) is given and doesn't occur in the file, returns None
+    without parsing.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+        st = os.fstat(f.fileno())
+    _KNOWN_CONTENT[path] = ((st.st_mtime_ns, st.st_size), hash(raw))
+    if needle is not None and needle not in raw:
+        return None
+    return json.loads(raw)
+
+
+def _atomic_write_json(path, obj, mode=None):
+    """Write obj as JSON to path via a temp file and rename.
+
+    The document is serialized up front and written in one call, so readers
+    never see a half-written file. mode defaults to the existing file's
+    permissions; symlinks are followed so the link itself is kept. The write
+    is skipped if the file is unchanged since we last read or wrote it and
+    already holds these exact bytes.
+    """
+    buf = _dumps(obj)
+    digest = hash(buf)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        pass
+    else:
+        current_mode = stat.S_IMODE(st.st_mode)
+        if (_KNOWN_CONTENT.get(path) == ((st.st_mtime_ns, st.st_size), digest)
+                and mode in (None, current_mode)):
+            return
+        if mode is None:
+            mode = current_mode
+    if mode is None:
+        # New files get 0o666 minus umask, same as open(path, "w")
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    real_path = os.path.realpath(path)
+    # A per-process temp name, so concurrent invocations don't write into each other's file
+    tmp = f"{real_path}.{os.getpid()}.tmp"
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+    try:
+        fd = os.open(tmp, flags, mode)
+    except FileExistsError:
+        # Left behind by a crashed process that had our pid
+        os.remove(tmp)
+        fd = os.open(tmp, flags, mode)
+    try:
+        # os.open() applies the umask; fchmod gives the exact mode we want
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(buf)
+        os.replace(tmp, real_path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    _KNOWN_CONTENT[path] = (_stat_key(path), digest)
+
+
+# Parsed profiles.json, keyed on (st_mtime_ns, st_size) so repeated loads
+# within one process skip the reparse while the file is unchanged
+_PROFILES_CACHE = {"key": None, "data": None}
+
+# Parsed ~/.claude.json, keyed the same way. It can be large and an OAuth
+# add/switch reads it several times in one command
+_CLAUDE_JSON_CACHE = {"key": None, "data": None}
 
 
 def detect_shell_rc():
@@ -47,49 +144,161 @@ def detect_shell_rc():
     return os.path.expanduser("~/.bashrc")
 
 
+# Directories already created/checked by _ensure_dir() in this process
+_ENSURED_DIRS = set()
+
+
+def _ensure_dir(path):
+    """Create path if needed, skipping the makedirs syscalls after the first call."""
+    if path not in _ENSURED_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _ENSURED_DIRS.add(path)
+
+
 def ensure_config_dir():
     """Create config directory if it doesn't exist."""
-    os.makedirs(CONFIG_DIR, exist_ok=True)
+    _ensure_dir(CONFIG_DIR)
+
+
+def _stat_key(path):
+    """Return a (mtime_ns, size) cache key for path."""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _index_profiles(profiles):
+    """Map profile name -> profile dict (first one wins, like a linear scan)."""
+    index = {}
+    for p in profiles:
+        index.setdefault(p["name"], p)
+    return index
 
 
 def load_profiles():
-    """Load profiles from JSON file. Returns default structure if not found."""
-    if not os.path.exists(PROFILES_PATH):
-        return dict(DEFAULT_PROFILES)
-    with open(PROFILES_PATH, "r") as f:
-        return json.load(f)
+    """Load profiles from JSON file. Returns default structure if not found.
+
+    The parsed data is cached until profiles.json changes on disk; callers
+    always get their own copy so they can mutate it freely. Loaded data
+    carries a "_by_name" index for find_profile(); it is never saved.
+    """
+    try:
+        key = _stat_key(PROFILES_PATH)
+    except FileNotFoundError:
+        return _default_profiles()
+    if _PROFILES_CACHE["key"] != key:
+        data = _read_json(PROFILES_PATH)
+        data["_by_name"] = _index_profiles(data.get("profiles", []))
+        _PROFILES_CACHE["data"] = data
+        _PROFILES_CACHE["key"] = key
+    # deepcopy keeps the index pointing at the copied profile dicts
+    return copy.deepcopy(_PROFILES_CACHE["data"])
 
 
 def save_profiles(data):
     """Save profiles to JSON file."""
     ensure_config_dir()
-    with open(PROFILES_PATH, "w") as f:
-        json.dump(data, f, indent=2)
-        f.write("\n")
+    data = {k: v for k, v in data.items() if k != "_by_name"}
+    _atomic_write_json(PROFILES_PATH, data)
+    # Prime the cache with what we just wrote so the next load skips the read
+    data = copy.deepcopy(data)
+    data["_by_name"] = _index_profiles(data.get("profiles", []))
+    _PROFILES_CACHE["key"] = _stat_key(PROFILES_PATH)
+    _PROFILES_CACHE["data"] = data
+
+
+def find_profile(data, name):
+    """Find a profile by name. Returns the profile dict or None."""
+    index = data.get("_by_name")
+    if index is not None:
+        return index.get(name)
+    for p in data.get("profiles", []):
+        if p["name"] == name:
+            return p
+    return None
+
+
+class ProfileStore:
+    """Load profiles once, mutate them in memory, and save on exit if changed.
+
+    Usage:
+        with ProfileStore() as store:
+            store.set_active("claude-direct")
+    """
+
+    def __enter__(self):
+        self._data = load_profiles()
+        self._dirty = False
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._dirty and exc_type is None:
+            save_profiles(self._data)
+        return False
+
+    @property
+    def active(self):
+        return self._data.get("active")
+
+    @property
+    def profiles(self):
+        return self._data.setdefault("profiles", [])
+
+    def find(self, name):
+        """Find a profile by name. Returns the profile dict or None."""
+        return find_profile(self._data, name)
+
+    def add(self, profile):
+        """Append a new profile."""
+        self.profiles.append(profile)
+        index = self._data.get("_by_name")
+        if index is not None:
+            index.setdefault(profile["name"], profile)
+        self._dirty = True
+
+    def remove(self, name):
+        """Remove a profile by name. Returns the removed profile or None."""
+        for i, p in enumerate(self.profiles):
+            if p["name"] == name:
+                self.profiles.pop(i)
+                if "_by_name" in self._data:
+                    self._data["_by_name"] = _index_profiles(self.profiles)
+                self._dirty = True
+                return p
+        return None
+
+    def set_active(self, name):
+        """Set the active profile name (None to clear)."""
+        if self._data.get("active") != name:
+            self._data["active"] = name
+            self._dirty = True
+
+    def mark_dirty(self):
+        """Flag in-place edits to a profile dict so they get saved on exit."""
+        self._dirty = True
+
+    def discard(self):
+        """Drop all pending changes; nothing is saved on exit."""
+        self._dirty = False
 
 
 def profiles_exist():
     """Check if profiles.json exists and has profiles."""
-    if not os.path.exists(PROFILES_PATH):
-        return False
     data = load_profiles()
     return len(data.get("profiles", [])) > 0
 
 
 def load_claude_settings():
     """Load Claude Code settings.json."""
-    if not os.path.exists(CLAUDE_SETTINGS_PATH):
+    try:
+        return _read_json(CLAUDE_SETTINGS_PATH)
+    except FileNotFoundError:
         return {}
-    with open(CLAUDE_SETTINGS_PATH, "r") as f:
-        return json.load(f)
 
 
 def save_claude_settings(settings):
     """Save Claude Code settings.json."""
-    os.makedirs(os.path.dirname(CLAUDE_SETTINGS_PATH), exist_ok=True)
-    with open(CLAUDE_SETTINGS_PATH, "w") as f:
-        json.dump(settings, f, indent=2)
-        f.write("\n")
+    _ensure_dir(os.path.dirname(CLAUDE_SETTINGS_PATH))
+    _atomic_write_json(CLAUDE_SETTINGS_PATH, settings)
 
 
 def load_claude_credentials():
@@ -97,78 +306,115 @@ def load_claude_credentials():
 
     Returns dict with credentials or None if not found.
     """
-    if not os.path.exists(CLAUDE_CREDENTIALS_PATH):
-        return None
     try:
-        with open(CLAUDE_CREDENTIALS_PATH, "r") as f:
-            return json.load(f)
+        return _read_json(CLAUDE_CREDENTIALS_PATH)
     except (json.JSONDecodeError, OSError):
         return None
 
 
 def save_claude_credentials(credentials):
     """Save OAuth credentials to ~/.claude/.credentials.json."""
-    os.makedirs(os.path.dirname(CLAUDE_CREDENTIALS_PATH), exist_ok=True)
-    with open(CLAUDE_CREDENTIALS_PATH, "w") as f:
-        json.dump(credentials, f, indent=2)
-        f.write("\n")
+    _ensure_dir(os.path.dirname(CLAUDE_CREDENTIALS_PATH))
     # Restrict permissions — credentials contain tokens
-    os.chmod(CLAUDE_CREDENTIALS_PATH, 0o600)
+    _atomic_write_json(CLAUDE_CREDENTIALS_PATH, credentials, mode=0o600)
 
 
 def remove_claude_credentials():
     """Remove ~/.claude/.credentials.json (for non-OAuth profiles)."""
-    if os.path.exists(CLAUDE_CREDENTIALS_PATH):
+    try:
         os.remove(CLAUDE_CREDENTIALS_PATH)
+    except FileNotFoundError:
+        pass
+
+
+def _load_claude_json(needle=None):
+    """Load ~/.claude.json, reusing the cached parse while the file is unchanged.
+
+    Returns the shared cached dict (only mutate it to write it straight back
+    with _save_claude_json), or None if the file doesn't exist. If needle is
+    given and the file has to be read from disk, also returns None without
+    parsing when the raw bytes don't contain it.
+    """
+    try:
+        key = _stat_key(CLAUDE_JSON_PATH)
+    except FileNotFoundError:
+        return None
+    if _CLAUDE_JSON_CACHE["key"] != key:
+        _CLAUDE_JSON_CACHE["key"] = None
+        data = _read_json(CLAUDE_JSON_PATH, needle)
+        if data is None:
+            return None
+        _CLAUDE_JSON_CACHE["data"] = data
+        _CLAUDE_JSON_CACHE["key"] = key
+    return _CLAUDE_JSON_CACHE["data"]
+
+
+def _save_claude_json(data):
+    """Write ~/.claude.json and point the cache at the written data."""
+    # Invalidate first so a failed write can't leave a mutated dict cached
+    _CLAUDE_JSON_CACHE["key"] = None
+    _CLAUDE_JSON_CACHE["data"] = data
+    _atomic_write_json(CLAUDE_JSON_PATH, data)
+    _CLAUDE_JSON_CACHE["key"] = _stat_key(CLAUDE_JSON_PATH)
+
+
+def _modify_claude_json(mutate, needle=None):
+    """Apply mutate(data) to ~/.claude.json with one read and one write.
+
+    Does nothing if the file is missing or can't be parsed. mutate may return
+    False to say nothing changed, which skips the write. needle is passed to
+    _load_claude_json() so a file that can't need the edit isn't parsed.
+    """
+    try:
+        data = _load_claude_json(needle)
+        if data is None:
+            return
+        if mutate(data) is False:
+            return
+        _save_claude_json(data)
+    except (json.JSONDecodeError, OSError):
+        pass
 
 
 def update_claude_json_oauth(oauth_account):
     """Update the oauthAccount field in ~/.claude.json and remove apiKeyHelper."""
-    if not os.path.exists(CLAUDE_JSON_PATH):
-        return
-    try:
-        with open(CLAUDE_JSON_PATH, "r") as f:
-            data = json.load(f)
+    def mutate(data):
         data["oauthAccount"] = oauth_account
         # Remove apiKeyHelper so Claude Code uses OAuth instead of API key
         data.pop("apiKeyHelper", None)
-        with open(CLAUDE_JSON_PATH, "w") as f:
-            json.dump(data, f, indent=2)
-            f.write("\n")
-    except (json.JSONDecodeError, OSError):
-        pass
+
+    _modify_claude_json(mutate)
 
 
 def remove_claude_json_oauth():
     """Remove the oauthAccount field from ~/.claude.json."""
-    if not os.path.exists(CLAUDE_JSON_PATH):
-        return
-    try:
-        with open(CLAUDE_JSON_PATH, "r") as f:
-            data = json.load(f)
-        data.pop("oauthAccount", None)
-        with open(CLAUDE_JSON_PATH, "w") as f:
-            json.dump(data, f, indent=2)
-            f.write("\n")
-    except (json.JSONDecodeError, OSError):
-        pass
+    def mutate(data):
+        if "oauthAccount" not in data:
+            return False
+        del data["oauthAccount"]
+
+    # ~/.claude.json can be megabytes; if the key isn't in the raw bytes,
+    # there's nothing to remove and no reason to parse or rewrite it
+    _modify_claude_json(mutate, needle=b'"oauthAccount"')
 
 
-def extract_oauth_info():
+def extract_oauth_info(creds=None):
     """Extract OAuth account info from ~/.claude.json and credentials for storage.
 
-    Returns dict with account info and credentials, or None if not found.
+    Pass creds if the caller already loaded ~/.claude/.credentials.json to
+    avoid reading it again. Returns dict with account info and credentials,
+    or None if not found.
     """
-    if not os.path.exists(CLAUDE_JSON_PATH):
-        return None
-
     try:
-        with open(CLAUDE_JSON_PATH, "r") as f:
-            data = json.load(f)
+        data = _load_claude_json()
+        if data is None:
+            return None
 
         oauth = data.get("oauthAccount")
         if not oauth:
             return None
+        # Detach from the shared ~/.claude.json cache before handing it out
+        oauth = copy.deepcopy(oauth)
 
         result = {
             "accountUuid": oauth.get("accountUuid"),
@@ -182,7 +428,7 @@ def extract_oauth_info():
         }
 
         # Also capture credentials file if it exists
-        credentials = load_claude_credentials()
+        credentials = creds if creds is not None else load_claude_credentials()
         if credentials:
             result["credentials"] = credentials
 
@@ -191,6 +437,35 @@ def extract_oauth_info():
         return None
 
 
+@functools.lru_cache(maxsize=None)
+def _shell_export_patterns():
+    """Compile the rc-file regexes on first use; only first-run setup needs them.
+
+    Returns (value_re, export_re): value_re matches the value part of
+    `VAR=value` (optional opening quote, then up to quote/space/#), and
+    export_re is the fallback for exports that don't start their line
+    (e.g. `if ...; then export X=...`). export_re is a lookahead so its
+    matches can overlap: in `export A=1;export B=2` the value of A swallows
+    `;export`, and B must still be found.
+    """
+    import re
+
+    value_re = re.compile(r'["\']?([^"\'\s#]+)')
+    export_re = re.compile(
+        r'(?=export\s+(' + "|".join(sorted(_SHELL_KEY_VARS)) + r')=' + value_re.pattern + r')'
+    )
+    return value_re, export_re
+
+
+def _read_if_exists(path):
+    """Return the text of path, or None if it doesn't exist."""
+    try:
+        with open(path, "rb") as f:
+            return f.read().decode("utf-8", "replace")
+    except FileNotFoundError:
+        return None
+
+
 def detect_shell_keys():
     """Detect LLM API key blocks in the shell rc file for import.
 
@@ -201,58 +476,77 @@ def detect_shell_keys():
         os.path.expanduser("~/.zshrc"),
     ]
 
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Read both files concurrently to overlap cold-cache I/O; map() keeps order
+    with ThreadPoolExecutor(max_workers=len(rc_candidates)) as executor:
+        texts = list(executor.map(_read_if_exists, rc_candidates))
+
     content = ""
     source_name = "shell rc"
-    for rc_path in rc_candidates:
-        if os.path.exists(rc_path):
-            with open(rc_path, "r") as f:
-                content += f.read() + "\n"
-            source_name = os.path.basename(rc_path)
+    for rc_path, text in zip(rc_candidates, texts):
+        if text is None:
+            continue
+        content += text + "\n"
+        source_name = os.path.basename(rc_path)
 
     if not content:
         return []
 
+    value_re, export_re = _shell_export_patterns()
+
+    # Walk the content once line by line, keeping the first value seen for each var
+    found = {}
+    for line in content.splitlines():
+        if "export" not in line:
+            continue
+        stripped = line.lstrip()
+        if stripped.startswith("export") and stripped[6:7].isspace() and stripped.count("export") == 1:
+            var, sep, rest = stripped[6:].lstrip().partition("=")
+            if sep and var in _SHELL_KEY_VARS and var not in found:
+                m = value_re.match(rest)
+                if m:
+                    found[var] = m.group(1)
+        else:
+            for m in export_re.finditer(line):
+                found.setdefault(m.group(1), m.group(2))
+
     profiles = []
 
     # Look for common patterns: export ANTHROPIC_API_KEY=...
     # Detect FortyAU/LiteLLM proxy config
-    litellm_key = re.search(r'export\s+LITELLM_PROXY_API_KEY=["\']?([^"\'\s#]+)', content)
-    litellm_url = re.search(r'export\s+LITELLM_PROXY_URL=["\']?([^"\'\s#]+)', content)
+    litellm_key = found.get("LITELLM_PROXY_API_KEY")
+    litellm_url = found.get("LITELLM_PROXY_URL")
     if litellm_key and litellm_url:
         profiles.append({
             "name": "litellm-proxy",
             "description": f"LiteLLM Proxy (imported from {source_name})",
             "type": "api",
-            "api_key": litellm_key.group(1),
-            "base_url": litellm_url.group(1),
+            "api_key": litellm_key,
+            "base_url": litellm_url,
         })
 
     # Detect direct Anthropic key
-    anthropic_key = re.search(r'export\s+ANTHROPIC_API_KEY=["\']?([^"\'\s#]+)', content)
-    if anthropic_key:
-        key_val = anthropic_key.group(1)
-        # Skip if it references another variable like $LITELLM_PROXY_API_KEY
-        if not key_val.startswith("$"):
-            profiles.append({
-                "name": "anthropic-direct",
-                "description": f"Anthropic Direct (imported from {source_name})",
-                "type": "api",
-                "api_key": key_val,
-                "base_url": "https://api.anthropic.com",
-            })
+    key_val = found.get("ANTHROPIC_API_KEY")
+    # Skip if it references another variable like $LITELLM_PROXY_API_KEY
+    if key_val and not key_val.startswith("$"):
+        profiles.append({
+            "name": "anthropic-direct",
+            "description": f"Anthropic Direct (imported from {source_name})",
+            "type": "api",
+            "api_key": key_val,
+            "base_url": "https://api.anthropic.com",
+        })
 
     # Detect OpenAI key
-    openai_key = re.search(r'export\s+OPENAI_API_KEY=["\']?([^"\'\s#]+)', content)
-    openai_url = re.search(r'export\s+OPENAI_BASE_URL=["\']?([^"\'\s#]+)', content)
-    if openai_key:
-        key_val = openai_key.group(1)
-        if not key_val.startswith("$"):
-            profiles.append({
-                "name": "openai-direct",
-                "description": f"OpenAI Direct (imported from {source_name})",
-                "type": "api",
-                "api_key": key_val,
-                "base_url": openai_url.group(1) if openai_url else "https://api.openai.com/v1",
-            })
+    key_val = found.get("OPENAI_API_KEY")
+    if key_val and not key_val.startswith("$"):
+        profiles.append({
+            "name": "openai-direct",
+            "description": f"OpenAI Direct (imported from {source_name})",
+            "type": "api",
+            "api_key": key_val,
+            "base_url": found.get("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+        })
 
     return profiles